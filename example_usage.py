@@ -42,13 +42,12 @@ def download_multiple_videos():
         "https://www.geeksforgeeks.org/video3-url"
     ]
     
-    # Download each video
-    for i, video_url in enumerate(video_urls, 1):
-        print(f"\n📹 Downloading video {i}/{len(video_urls)}")
-        output_filename = f"video_{i}.mp4"
-        
-        success = downloader.download_video(video_url, output_filename)
-        
+    output_filenames = [f"video_{i}.mp4" for i in range(1, len(video_urls) + 1)]
+    
+    # Download all videos; upcoming pages are resolved while the current one downloads
+    results = downloader.download_videos(video_urls, output_filenames)
+    
+    for i, success in enumerate(results, 1):
         if success:
             print(f"✅ Video {i} downloaded successfully!")
         else:
@@ -102,6 +101,26 @@ def extract_video_url_only():
     # Logout
     downloader.logout()
 
+def estimate_videos_only():
+    """Example: Estimate size and duration without downloading"""
+    print("=== Dry Run Estimate Example ===")
+    
+    # Initialize downloader
+    downloader = GFGDownloader()
+    
+    # List of video URLs to estimate
+    video_urls = [
+        "https://www.geeksforgeeks.org/video1-url",
+        "https://www.geeksforgeeks.org/video2-url",
+        "https://www.geeksforgeeks.org/video3-url"
+    ]
+    
+    # Only playlists and a few segment HEAD requests are fetched
+    results = downloader.estimate_videos(video_urls)
+    
+    total_bytes = sum(result['estimated_bytes'] or 0 for result in results)
+    print(f"💾 Storage needed: {total_bytes / (1024 * 1024):.1f} MB")
+
 def main():
     """Main function to run examples"""
     print("🎬 GeeksforGeeks HLS Downloader - Example Usage")
@@ -118,15 +137,18 @@ def main():
             download_with_custom_config()
         elif example_type == "extract":
             extract_video_url_only()
+        elif example_type == "estimate":
+            estimate_videos_only()
         else:
             print("❌ Unknown example type!")
-            print("Available examples: single, multiple, custom, extract")
+            print("Available examples: single, multiple, custom, extract, estimate")
     else:
         print("Available examples:")
         print("1. single   - Download a single video")
         print("2. multiple - Download multiple videos")
         print("3. custom   - Download with custom configuration")
         print("4. extract  - Extract video URL only")
+        print("5. estimate - Estimate size and duration without downloading")
         print("\nUsage: python example_usage.py <example_type>")
         print("Example: python example_usage.py single")
 
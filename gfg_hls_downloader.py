@@ -16,8 +16,19 @@ import os
 import sys
 import time
 import json
+import re
+import struct
+import hashlib
 import getpass
-from urllib.parse import urlparse, parse_qs
+import threading
+import functools
+import itertools
+import shutil
+import tempfile
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse, parse_qs, urljoin
 from pathlib import Path
 
 # Try to import tqdm for progress bars, install if not available
@@ -39,6 +50,272 @@ COOKIES_FILE = 'cookies.txt'
 LOGOUT_URL = "https://auth.geeksforgeeks.org/logout.php"
 LOGIN_URL = "https://auth.geeksforgeeks.org/auth.php"
 
+# Segmented (HTTP range) download defaults
+RANGE_SEGMENT_SIZE_MB = 8
+RANGE_WORKERS = 8
+RANGE_RETRIES = 3
+STREAM_CHUNK_SIZE = 256 * 1024
+# Anything larger than this is not a playlist (e.g. a direct MP4 link)
+MAX_PLAYLIST_BYTES = 4 * 1024 * 1024
+
+# Output verification
+MANIFEST_SUFFIX = '.manifest.json'
+DURATION_TOLERANCE_SECONDS = 2.0
+
+# Batch mode: how many upcoming videos to resolve ahead of the current download,
+# and how long a resolved (possibly signed) URL is trusted before resolving again
+PREFETCH_LOOKAHEAD = 2
+PREFETCH_MAX_AGE_SECONDS = 300
+
+# Profiling: per-job Chrome trace / Perfetto JSON files
+TRACE_DIRECTORY = 'traces'
+TRACE_SEQUENCE = itertools.count(1)
+NULL_SPAN = nullcontext()
+
+# Disk writes: write-behind buffer per range, fsync batching and an optional
+# global write budget (0 = unlimited)
+WRITE_BUFFER_MB = 4
+FSYNC_INTERVAL_MB = 64
+IO_BUDGET_MB_PER_SEC = 0
+
+# Dry run: segments probed per rendition and videos estimated concurrently
+ESTIMATE_SAMPLE_SEGMENTS = 3
+ESTIMATE_WORKERS = 8
+
+class Tracer:
+    """Collects timing spans and exports them as Chrome trace JSON"""
+    
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self.thread_names = {}
+        self.lock = threading.Lock()
+    
+    def add(self, name, category, start, end, args=None):
+        """Record a complete span from perf_counter() timestamps"""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args or {}
+        }
+        with self.lock:
+            self.events.append(event)
+            self.thread_names[thread.ident] = thread.name
+    
+    @contextmanager
+    def span(self, name, category='phase', **args):
+        """Time the enclosed block as one span"""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add(name, category, start, time.perf_counter(), args)
+    
+    def export(self, path):
+        """Write the trace, loadable in chrome://tracing or ui.perfetto.dev"""
+        with self.lock:
+            events = list(self.events)
+            names = dict(self.thread_names)
+        metadata = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                     "args": {"name": name}} for tid, name in names.items()]
+        with open(path, 'w') as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+
+class IOBudget:
+    """Caps the combined write throughput of every output sharing it"""
+    
+    def __init__(self, bytes_per_second):
+        self.rate = bytes_per_second
+        self.next_free = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def consume(self, nbytes):
+        """Block until nbytes may be written"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_free)
+            self.next_free = start + nbytes / self.rate
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+def read_umask():
+    """Current process umask (it can only be read by setting it)"""
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+class OutputWriter:
+    """Writes one output file in a staging directory and moves it into place
+
+    All ranges share one file handle, fsyncs happen every fsync_interval
+    bytes and on commit rather than per segment, and the finished file is
+    renamed into its final path so partial files never show up there.
+    """
+    
+    # mkstemp creates files 0600; committed files get the mode open() would
+    # give them. Read once at import, before any threads create files
+    file_mode = 0o666 & ~read_umask()
+    
+    def __init__(self, final_path, staging_dir=None, buffer_size=WRITE_BUFFER_MB * 1024 * 1024,
+                 fsync_interval=FSYNC_INTERVAL_MB * 1024 * 1024, io_budget=None):
+        self.final_path = final_path
+        self.buffer_size = buffer_size
+        self.fsync_interval = fsync_interval
+        self.io_budget = io_budget
+        self.lock = threading.Lock()
+        self.file = None
+        self.unsynced = 0
+        
+        # Keep the extension last so tools like ffmpeg still pick the right format
+        stem, ext = os.path.splitext(os.path.basename(final_path))
+        staging_dir = staging_dir or os.path.dirname(final_path) or '.'
+        Path(staging_dir).mkdir(parents=True, exist_ok=True)
+        fd, self.staging_path = tempfile.mkstemp(prefix=f"{stem}.", suffix=f".part{ext}", dir=staging_dir)
+        os.close(fd)
+    
+    def open(self):
+        if self.file is None:
+            self.file = open(self.staging_path, 'r+b', buffering=0)
+        return self.file
+    
+    def truncate(self, size):
+        """Set the staged file's size, e.g. to preallocate for ranged writes"""
+        with self.lock:
+            self.open().truncate(size)
+    
+    def write_at(self, offset, data):
+        """Write data at offset, throttled by the shared I/O budget"""
+        if self.io_budget is not None:
+            self.io_budget.consume(len(data))
+        with self.lock:
+            f = self.open()
+            f.seek(offset)
+            # Unbuffered writes may be short (NFS, nearly full disks)
+            view = memoryview(data)
+            while view:
+                written = f.write(view)
+                if not written:
+                    raise IOError(f"could not write at offset {offset + len(data) - len(view)}")
+                view = view[written:]
+            self.unsynced += len(data)
+            if self.unsynced >= self.fsync_interval:
+                self.checkpoint()
+    
+    def range_writer(self, offset):
+        """Buffered sequential writer starting at offset"""
+        return RangeWriter(self, offset)
+    
+    def checkpoint(self):
+        """fsync everything written so far (call with the lock held)"""
+        if self.file is not None and self.unsynced:
+            os.fsync(self.file.fileno())
+        self.unsynced = 0
+    
+    def commit(self):
+        """Sync the staged file and atomically move it to its final path"""
+        with self.lock:
+            if self.file is not None:
+                self.checkpoint()
+                self.file.close()
+                self.file = None
+            else:
+                # Written by an external tool (ffmpeg), sync it once here
+                with open(self.staging_path, 'rb') as f:
+                    os.fsync(f.fileno())
+        
+        os.chmod(self.staging_path, self.file_mode)
+        try:
+            os.replace(self.staging_path, self.final_path)
+        except OSError:
+            # Staging directory on another filesystem: copy next to the
+            # target first so the final rename is still atomic
+            partial_path = self.final_path + '.part'
+            try:
+                shutil.copyfile(self.staging_path, partial_path)
+                with open(partial_path, 'rb') as f:
+                    os.fsync(f.fileno())
+                os.replace(partial_path, self.final_path)
+            except OSError:
+                if os.path.exists(partial_path):
+                    os.remove(partial_path)
+                raise
+            os.remove(self.staging_path)
+    
+    def abort(self):
+        """Drop the staged file"""
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+        if os.path.exists(self.staging_path):
+            os.remove(self.staging_path)
+
+class RangeWriter:
+    """Write-behind buffer for one sequential run of bytes in an OutputWriter"""
+    
+    def __init__(self, output, offset):
+        self.output = output
+        self.offset = offset
+        self.buffer = bytearray()
+    
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= self.output.buffer_size:
+            self.flush()
+    
+    def flush(self):
+        if self.buffer:
+            self.output.write_at(self.offset, bytes(self.buffer))
+            self.offset += len(self.buffer)
+            self.buffer.clear()
+
+def traced(name, category='phase'):
+    """Record each call of a GFGDownloader method as a span when tracing is on"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.tracer is None:
+                return method(self, *args, **kwargs)
+            with self.tracer.span(name, category):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def traced_job(method):
+    """Trace a whole download job and export it when trace_downloads is enabled"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        # Nested jobs (or tracing turned off) run untouched
+        if self.tracer is not None or not self.config.get('trace_downloads', False):
+            return method(self, *args, **kwargs)
+        
+        self.tracer = Tracer()
+        try:
+            with self.tracer.span(method.__name__, 'job'):
+                return method(self, *args, **kwargs)
+        finally:
+            tracer, self.tracer = self.tracer, None
+            trace_dir = self.config.get('trace_directory', TRACE_DIRECTORY)
+            # Milliseconds and a per-process sequence number keep jobs that end
+            # within the same second (e.g. a quick failure and its retry) apart
+            now = time.time()
+            stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(now))}.{int(now % 1 * 1000):03d}"
+            trace_path = os.path.join(trace_dir, f"{method.__name__}-{stamp}-{os.getpid()}-{next(TRACE_SEQUENCE)}.json")
+            try:
+                Path(trace_dir).mkdir(exist_ok=True)
+                tracer.export(trace_path)
+                print(f"⏱️  Trace saved to {trace_path}")
+            except IOError as e:
+                print(f"⚠️  Could not save trace: {e}")
+    return wrapper
+
 class GFGDownloader:
     """Main class for downloading GeeksforGeeks videos"""
     
@@ -50,6 +327,14 @@ class GFGDownloader:
         }
         self.session.headers.update(self.headers)
         self.config = self.load_config()
+        # Playlists fetched ahead of time by the batch resolver
+        self.playlist_cache = {}
+        self.playlist_cache_lock = threading.Lock()
+        # Set to a Tracer while a traced job runs
+        self.tracer = None
+        # Shared by every output so the write budget is global
+        io_budget = self.config.get('io_budget_mb_per_sec', IO_BUDGET_MB_PER_SEC)
+        self.io_budget = IOBudget(io_budget * 1024 * 1024) if io_budget else None
     
     def load_config(self):
         """Load configuration from config.json or create default"""
@@ -71,6 +356,20 @@ class GFGDownloader:
             "output_directory": "downloads",
             "preferred_downloader": "yt-dlp",  # or "ffmpeg"
             "video_quality": "best",
+            "segmented_download": True,
+            "range_workers": RANGE_WORKERS,
+            "range_segment_size_mb": RANGE_SEGMENT_SIZE_MB,
+            "verify_downloads": True,
+            "prefetch_lookahead": PREFETCH_LOOKAHEAD,
+            "prefetch_max_age_seconds": PREFETCH_MAX_AGE_SECONDS,
+            "trace_downloads": False,
+            "trace_directory": TRACE_DIRECTORY,
+            "staging_directory": "",
+            "write_buffer_mb": WRITE_BUFFER_MB,
+            "fsync_interval_mb": FSYNC_INTERVAL_MB,
+            "io_budget_mb_per_sec": IO_BUDGET_MB_PER_SEC,
+            "estimate_sample_segments": ESTIMATE_SAMPLE_SEGMENTS,
+            "estimate_workers": ESTIMATE_WORKERS,
             "custom_headers": {
                 "Origin": "https://www.geeksforgeeks.org",
                 "Referer": "https://www.geeksforgeeks.org"
@@ -112,6 +411,13 @@ class GFGDownloader:
         except IOError as e:
             print(f"Error saving config: {e}")
     
+    def trace_span(self, name, category='phase', **args):
+        """Span context manager, or a shared no-op one when tracing is off"""
+        if self.tracer is None:
+            return NULL_SPAN
+        return self.tracer.span(name, category, **args)
+    
+    @traced('login')
     def login(self):
         """Login to GeeksforGeeks"""
         try:
@@ -144,6 +450,7 @@ class GFGDownloader:
             print(f"❌ Login error: {e}")
             return False
     
+    @traced('logout')
     def logout(self):
         """Logout from GeeksforGeeks"""
         try:
@@ -153,6 +460,7 @@ class GFGDownloader:
             print(f"Logout error: {e}")
             return False
     
+    @traced('extract_video_url')
     def extract_video_url(self, gfg_url):
         """Extract video URL from GeeksforGeeks page"""
         try:
@@ -179,7 +487,8 @@ class GFGDownloader:
             }
             
             # Get the video page to extract the actual video URL
-            resp = self.session.get(gfg_url, headers=video_headers)
+            with self.trace_span('page_fetch'):
+                resp = self.session.get(gfg_url, headers=video_headers, timeout=30)
             
             if resp.status_code != 200:
                 print(f"❌ Failed to fetch page: {resp.status_code}")
@@ -191,28 +500,29 @@ class GFGDownloader:
             # Try multiple patterns to find video URLs
             import re
             
-            # Pattern 1: Direct m3u8 URLs
-            m3u8_pattern = r'https://[^"\']*\.m3u8[^"\']*'
-            m3u8_matches = re.findall(m3u8_pattern, content)
+            with self.trace_span('regex_extraction'):
+                # Pattern 1: Direct m3u8 URLs
+                m3u8_pattern = r'https://[^"\']*\.m3u8[^"\']*'
+                m3u8_matches = re.findall(m3u8_pattern, content)
             
-            # Pattern 2: Look for video URLs in JavaScript variables
-            js_video_pattern = r'["\']([^"\']*video[^"\']*\.m3u8[^"\']*)["\']'
-            js_matches = re.findall(js_video_pattern, content, re.IGNORECASE)
+                # Pattern 2: Look for video URLs in JavaScript variables
+                js_video_pattern = r'["\']([^"\']*video[^"\']*\.m3u8[^"\']*)["\']'
+                js_matches = re.findall(js_video_pattern, content, re.IGNORECASE)
             
-            # Pattern 3: Look for video URLs in data attributes or JSON
-            json_video_pattern = r'["\']([^"\']*\.m3u8[^"\']*)["\']'
-            json_matches = re.findall(json_video_pattern, content)
+                # Pattern 3: Look for video URLs in data attributes or JSON
+                json_video_pattern = r'["\']([^"\']*\.m3u8[^"\']*)["\']'
+                json_matches = re.findall(json_video_pattern, content)
             
-            # Pattern 4: Look for video URLs in src attributes
-            src_pattern = r'src=["\']([^"\']*\.m3u8[^"\']*)["\']'
-            src_matches = re.findall(src_pattern, content)
+                # Pattern 4: Look for video URLs in src attributes
+                src_pattern = r'src=["\']([^"\']*\.m3u8[^"\']*)["\']'
+                src_matches = re.findall(src_pattern, content)
             
-            # Pattern 5: Look for video URLs in data-src or similar attributes
-            data_src_pattern = r'data-[^=]*=["\']([^"\']*\.m3u8[^"\']*)["\']'
-            data_src_matches = re.findall(data_src_pattern, content)
+                # Pattern 5: Look for video URLs in data-src or similar attributes
+                data_src_pattern = r'data-[^=]*=["\']([^"\']*\.m3u8[^"\']*)["\']'
+                data_src_matches = re.findall(data_src_pattern, content)
             
-            # Combine all matches
-            all_matches = m3u8_matches + js_matches + json_matches + src_matches + data_src_matches
+                # Combine all matches
+                all_matches = m3u8_matches + js_matches + json_matches + src_matches + data_src_matches
             
             print(f"🔍 Found {len(all_matches)} potential video URLs")
             
@@ -251,13 +561,15 @@ class GFGDownloader:
             print(f"❌ Error extracting video URL: {e}")
             return None
     
+    @traced('download_with_ytdlp')
     def download_with_ytdlp(self, video_url, output_filename=None):
         """Download video using yt-dlp with progress bar"""
         try:
             print("🚀 Starting download with yt-dlp...")
             
             # Check if yt-dlp is installed
-            result = subprocess.run(['yt-dlp', '--version'], capture_output=True, text=True)
+            with self.trace_span('tool_probe', tool='yt-dlp'):
+                result = subprocess.run(['yt-dlp', '--version'], capture_output=True, text=True)
             if result.returncode != 0:
                 print("📦 Installing yt-dlp...")
                 subprocess.run([sys.executable, '-m', 'pip', 'install', 'yt-dlp'], check=True)
@@ -302,6 +614,7 @@ class GFGDownloader:
             print(f"🔧 Running command: {' '.join(cmd)}")
             
             # Run yt-dlp with real-time output
+            subprocess_start = time.perf_counter()
             process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
                                      universal_newlines=True, bufsize=1)
             
@@ -315,6 +628,9 @@ class GFGDownloader:
             
             # Get the return code
             return_code = process.poll()
+            if self.tracer is not None:
+                self.tracer.add('subprocess', 'subprocess', subprocess_start, time.perf_counter(),
+                                {"tool": "yt-dlp", "returncode": return_code})
             
             if return_code == 0:
                 print("✅ Video downloaded successfully with yt-dlp!")
@@ -327,13 +643,16 @@ class GFGDownloader:
             print(f"❌ Error downloading video with yt-dlp: {e}")
             return False
     
+    @traced('download_with_ffmpeg')
     def download_with_ffmpeg(self, m3u8_url, output_filename="video.mp4"):
         """Download HLS video using ffmpeg with progress"""
+        writer = None
         try:
             print("🚀 Starting download with ffmpeg...")
             
             # Check if ffmpeg is available
-            result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
+            with self.trace_span('tool_probe', tool='ffmpeg'):
+                result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
             if result.returncode != 0:
                 print("❌ ffmpeg not found. Please install ffmpeg first.")
                 print("📖 Installation guide: https://ffmpeg.org/download.html")
@@ -344,6 +663,9 @@ class GFGDownloader:
             Path(output_dir).mkdir(exist_ok=True)
             output_path = os.path.join(output_dir, output_filename)
             
+            # ffmpeg writes into the staging directory, the result is moved into place
+            writer = self.open_output(output_path)
+            
             # Prepare ffmpeg command with proper headers and progress
             custom_headers = self.config.get('custom_headers', {})
             header_string = '\r\n'.join([f'{k}: {v}' for k, v in custom_headers.items()])
@@ -356,12 +678,22 @@ class GFGDownloader:
                 '-bsf:a', 'aac_adtstoasc',
                 '-progress', 'pipe:1',
                 '-y',
-                output_path
+                writer.staging_path
             ]
             
+            # Hash the muxed packets as a second output so the file never has to be re-read
+            verify = self.config.get('verify_downloads', True)
+            hash_path = writer.staging_path + '.sha256'
+            expected_duration = None
+            if verify:
+                cmd.extend(['-c', 'copy', '-f', 'hash', '-hash', 'sha256', hash_path])
+                expected_duration = self.get_expected_duration(m3u8_url)
+            processed_seconds = None
+            
             print(f"🔧 Running command: {' '.join(cmd)}")
             
             # Run ffmpeg with real-time progress
+            subprocess_start = time.perf_counter()
             process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
                                      universal_newlines=True, bufsize=1)
             
@@ -377,6 +709,7 @@ class GFGDownloader:
                             time_part = line.split('out_time_ms=')[1].split()[0]
                             time_ms = int(time_part)
                             time_sec = time_ms / 1000000
+                            processed_seconds = time_sec
                             print(f"⏱️  Progress: {time_sec:.1f}s processed", end='\r')
                         except:
                             pass
@@ -392,12 +725,27 @@ class GFGDownloader:
             
             # Get the return code
             return_code = process.poll()
+            if self.tracer is not None:
+                self.tracer.add('subprocess', 'subprocess', subprocess_start, time.perf_counter(),
+                                {"tool": "ffmpeg", "returncode": return_code})
+            
+            digest = None
+            if os.path.exists(hash_path):
+                with open(hash_path, 'r') as f:
+                    digest = f.read().strip().partition('=')[2].lower() or None
+                os.remove(hash_path)
             
             if return_code == 0:
+                checksum = {"algorithm": "sha256-packets", "digest": digest}
+                if not self.finish_output(writer, m3u8_url, 'ffmpeg', checksum,
+                                          expected_duration=expected_duration,
+                                          duration=processed_seconds):
+                    return False
                 print(f"✅ Video downloaded successfully as {output_path}!")
                 return True
             else:
                 print("❌ Error downloading video with ffmpeg")
+                writer.abort()
                 stderr_output = process.stderr.read()
                 if stderr_output:
                     print("Error details:")
@@ -406,8 +754,627 @@ class GFGDownloader:
                 
         except Exception as e:
             print(f"❌ Error downloading video with ffmpeg: {e}")
+            if writer is not None:
+                writer.abort()
             return False
-    
+
+    def open_output(self, output_path):
+        """Create an OutputWriter for output_path using the disk settings"""
+        return OutputWriter(
+            output_path,
+            staging_dir=self.config.get('staging_directory') or tempfile.gettempdir(),
+            buffer_size=int(self.config.get('write_buffer_mb', WRITE_BUFFER_MB) * 1024 * 1024),
+            fsync_interval=int(self.config.get('fsync_interval_mb', FSYNC_INTERVAL_MB) * 1024 * 1024),
+            io_budget=self.io_budget
+        )
+
+    def get_media_headers(self):
+        """Headers for media requests made through the shared session"""
+        headers = dict(self.config.get('custom_headers', {}))
+        headers['User-Agent'] = self.headers['User-Agent']
+        # Byte offsets only make sense on the raw body
+        headers['Accept-Encoding'] = 'identity'
+        # Drop the session-wide auth host so CDNs get their own Host header
+        headers['host'] = None
+        return headers
+
+    @traced('probe_range_support')
+    def probe_range_support(self, url):
+        """Return (final_url, total_size, supports_ranges) for a media URL
+
+        total_size is 0 if neither a successful HEAD nor a successful GET
+        reported it; the length of an error page is never used.
+        """
+        headers = self.get_media_headers()
+
+        resp = self.session.head(url, headers=headers, allow_redirects=True, timeout=30)
+        final_url = resp.url or url
+        total_size = 0
+        if resp.ok:
+            total_size = int(resp.headers.get('Content-Length', 0) or 0)
+            if total_size > 0 and resp.headers.get('Accept-Ranges', '').lower() == 'bytes':
+                return final_url, total_size, True
+
+        # Some servers don't advertise ranges on HEAD, ask for a single byte instead
+        headers['Range'] = 'bytes=0-0'
+        with self.session.get(final_url, headers=headers, stream=True, timeout=30) as resp:
+            content_range = resp.headers.get('Content-Range', '')
+            if resp.status_code == 206 and '/' in content_range:
+                total = content_range.rsplit('/', 1)[1]
+                if total.isdigit():
+                    return resp.url or final_url, int(total), True
+            if resp.status_code == 200:
+                total_size = int(resp.headers.get('Content-Length', 0) or 0) or total_size
+
+        return final_url, total_size, False
+
+    def split_ranges(self, total_size, segment_size):
+        """Split [0, total_size) into inclusive (start, end) byte ranges"""
+        return [(start, min(start + segment_size, total_size) - 1)
+                for start in range(0, total_size, segment_size)]
+
+    def ranges_checksum(self, byte_ranges, digests, segment_size):
+        """Combine per-range SHA-256 digests into a file checksum
+
+        The checksum is a hash over the range digests in offset order, so it
+        only depends on the content and the segment size.
+        """
+        ranges = [{"offset": start, "length": end - start + 1, "sha256": digest}
+                  for (start, end), digest in zip(byte_ranges, digests)]
+        tree = hashlib.sha256(''.join(digests).encode('ascii'))
+        checksum = {"algorithm": "sha256-ranges", "digest": tree.hexdigest(), "block_size": segment_size}
+        return checksum, ranges
+
+    @traced('fetch_media_playlist')
+    def fetch_media_playlist(self, m3u8_url):
+        """Fetch an HLS playlist, following a master playlist to one variant
+
+        Returns (playlist_url, content) or None. Results prefetched by the
+        batch resolver are reused while they are younger than
+        prefetch_max_age_seconds.
+        """
+        max_age = self.config.get('prefetch_max_age_seconds', PREFETCH_MAX_AGE_SECONDS)
+        with self.playlist_cache_lock:
+            cached = self.playlist_cache.get(m3u8_url)
+        if cached and time.time() - cached[0] < max_age:
+            return cached[1]
+
+        headers = self.get_media_headers()
+        playlist = self.get_playlist_text(m3u8_url, headers)
+        if not playlist:
+            return None
+        playlist_url, content = playlist
+
+        # Master playlist: pick a variant according to video_quality
+        if '#EXT-X-STREAM-INF' in content:
+            variants, _ = self.parse_master_playlist(playlist_url, content)
+            if not variants:
+                return None
+            playlist = self.get_playlist_text(self.select_variant(variants)['uri'], headers)
+            if not playlist:
+                return None
+            playlist_url, content = playlist
+
+        now = time.time()
+        with self.playlist_cache_lock:
+            for url in [url for url, (fetched_at, _) in self.playlist_cache.items() if now - fetched_at >= max_age]:
+                del self.playlist_cache[url]
+            self.playlist_cache[m3u8_url] = (now, (playlist_url, content))
+        return playlist_url, content
+
+    def get_playlist_text(self, url, headers):
+        """GET url and return (final_url, text) if it is an HLS playlist, else None
+
+        The body is streamed so a non-playlist (such as a whole MP4) is
+        rejected after its first chunk instead of being downloaded.
+        """
+        with self.session.get(url, headers=headers, stream=True, timeout=30) as resp:
+            if resp.status_code != 200:
+                return None
+            body = bytearray()
+            for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                body += chunk
+                head = body.lstrip(b'\xef\xbb\xbf \t\r\n')
+                if len(head) >= len(b'#EXTM3U') and not head.startswith(b'#EXTM3U'):
+                    return None
+                if len(body) > MAX_PLAYLIST_BYTES:
+                    return None
+            if not body.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'#EXTM3U'):
+                return None
+            # Playlists are UTF-8 (RFC 8216)
+            return resp.url or url, body.decode('utf-8-sig', errors='replace')
+
+    def parse_attributes(self, line):
+        """Parse the KEY=value attribute list of an HLS tag"""
+        return {key: value.strip('"') for key, value in
+                re.findall(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)', line.split(':', 1)[-1])}
+
+    def parse_master_playlist(self, playlist_url, content):
+        """Return (variants, media) from a master playlist
+
+        Variants come from #EXT-X-STREAM-INF, media from #EXT-X-MEDIA tags
+        that have their own playlist (e.g. separate audio renditions).
+        """
+        variants, media = [], []
+        lines = content.splitlines()
+        for i, line in enumerate(lines):
+            if line.startswith('#EXT-X-STREAM-INF'):
+                attrs = self.parse_attributes(line)
+                uri = next((l.strip() for l in lines[i + 1:] if l.strip() and not l.startswith('#')), None)
+                if uri:
+                    variants.append({
+                        "uri": urljoin(playlist_url, uri),
+                        "bandwidth": int(attrs.get('BANDWIDTH', 0) or 0),
+                        "resolution": attrs.get('RESOLUTION'),
+                        "audio": attrs.get('AUDIO')
+                    })
+            elif line.startswith('#EXT-X-MEDIA:'):
+                attrs = self.parse_attributes(line)
+                if attrs.get('URI'):
+                    media.append({
+                        "uri": urljoin(playlist_url, attrs['URI']),
+                        "type": attrs.get('TYPE', '').lower(),
+                        "group": attrs.get('GROUP-ID'),
+                        "name": attrs.get('NAME'),
+                        "default": attrs.get('DEFAULT') == 'YES'
+                    })
+        return variants, media
+
+    def select_variant(self, variants):
+        """Pick the variant matching video_quality (lowest bandwidth for "worst")"""
+        ordered = sorted(variants, key=lambda variant: variant['bandwidth'])
+        return ordered[0] if self.config.get('video_quality') == 'worst' else ordered[-1]
+
+    def playlist_duration(self, content):
+        """Sum of the #EXTINF durations in a media playlist"""
+        return sum(float(duration) for duration in re.findall(r'#EXTINF:\s*([\d.]+)', content))
+
+    def get_expected_duration(self, m3u8_url):
+        """Expected duration of an HLS stream in seconds, or None if unknown"""
+        if not urlparse(m3u8_url).path.lower().endswith('.m3u8'):
+            return None
+        try:
+            playlist = self.fetch_media_playlist(m3u8_url)
+        except requests.RequestException as e:
+            print(f"⚠️  Could not fetch playlist for verification: {e}")
+            return None
+        if not playlist:
+            return None
+        return self.playlist_duration(playlist[1]) or None
+
+    @traced('parse_byterange_playlist')
+    def parse_byterange_playlist(self, m3u8_url):
+        """Resolve an HLS playlist whose segments are byte ranges of one MP4 file
+
+        Returns (resource_url, byte_ranges, duration) or None if the playlist
+        isn't a plain, unencrypted single-file #EXT-X-BYTERANGE playlist.
+        """
+        playlist = self.fetch_media_playlist(m3u8_url)
+        if not playlist:
+            return None
+        playlist_url, content = playlist
+
+        if '#EXT-X-BYTERANGE' not in content:
+            return None
+
+        resources = set()
+        byte_ranges = []
+        pending_range = None
+        next_offset = 0
+        for line in content.splitlines():
+            line = line.strip()
+            if line.startswith('#EXT-X-KEY'):
+                method = re.search(r'METHOD=([A-Z0-9-]+)', line)
+                if method and method.group(1) != 'NONE':
+                    # Encrypted segments have to go through ffmpeg/yt-dlp
+                    return None
+            elif line.startswith('#EXT-X-MAP'):
+                uri = re.search(r'URI="([^"]+)"', line)
+                map_range = re.search(r'BYTERANGE="(\d+)(?:@(\d+))?"', line)
+                if not uri or not map_range:
+                    return None
+                length, offset = int(map_range.group(1)), int(map_range.group(2) or 0)
+                resources.add(urljoin(playlist_url, uri.group(1)))
+                byte_ranges.append((offset, offset + length - 1))
+            elif line.startswith('#EXT-X-BYTERANGE:'):
+                length, _, offset = line.split(':', 1)[1].partition('@')
+                start = int(offset) if offset else next_offset
+                pending_range = (start, start + int(length) - 1)
+                next_offset = start + int(length)
+            elif line and not line.startswith('#'):
+                if pending_range is None:
+                    return None
+                resources.add(urljoin(playlist_url, line))
+                byte_ranges.append(pending_range)
+                pending_range = None
+
+        if len(resources) != 1 or not byte_ranges:
+            return None
+        resource_url = resources.pop()
+        if not urlparse(resource_url).path.lower().endswith('.mp4'):
+            return None
+
+        # The ranges must cover the file from the first byte without gaps,
+        # otherwise writing them in place wouldn't reproduce the MP4
+        covered = -1
+        for start, end in sorted(byte_ranges):
+            if start > covered + 1:
+                return None
+            covered = max(covered, end)
+
+        return resource_url, byte_ranges, self.playlist_duration(content)
+
+    def fetch_range(self, url, start, end, writer):
+        """Fetch one byte range and write it in place through an OutputWriter
+
+        Returns (bytes_written, sha256_hexdigest), or None if the server
+        ignored the Range header. When tracing, the fetch is recorded with
+        its time to first byte (which includes DNS and connect, as requests
+        doesn't expose them), transfer and disk write times.
+        """
+        headers = self.get_media_headers()
+        headers['Range'] = f'bytes={start}-{end}'
+        expected = end - start + 1
+
+        for attempt in range(1, RANGE_RETRIES + 1):
+            try:
+                request_start = time.perf_counter()
+                with self.session.get(url, headers=headers, stream=True, timeout=60) as resp:
+                    headers_received = time.perf_counter()
+                    if resp.status_code == 200:
+                        return None
+                    resp.raise_for_status()
+
+                    written = 0
+                    disk_time = 0.0
+                    digest = hashlib.sha256()
+                    sink = writer.range_writer(start)
+                    for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                        write_start = time.perf_counter()
+                        sink.write(chunk)
+                        disk_time += time.perf_counter() - write_start
+                        digest.update(chunk)
+                        written += len(chunk)
+                    write_start = time.perf_counter()
+                    sink.flush()
+                    disk_time += time.perf_counter() - write_start
+
+                    if written != expected:
+                        raise IOError(f"short read for bytes {start}-{end}: {written}/{expected}")
+
+                    if self.tracer is not None:
+                        finished = time.perf_counter()
+                        self.tracer.add('ttfb', 'network', request_start, headers_received)
+                        self.tracer.add('transfer', 'network', headers_received, finished)
+                        self.tracer.add('fetch_range', 'segment', request_start, finished, {
+                            "start": start,
+                            "end": end,
+                            "bytes": written,
+                            "attempt": attempt,
+                            "ttfb_ms": (headers_received - request_start) * 1000,
+                            "transfer_ms": (finished - headers_received) * 1000,
+                            "disk_ms": disk_time * 1000
+                        })
+                    return written, digest.hexdigest()
+            except (requests.RequestException, IOError) as e:
+                if attempt == RANGE_RETRIES:
+                    raise
+                print(f"⚠️  Retrying bytes {start}-{end} ({attempt}/{RANGE_RETRIES}): {e}")
+                time.sleep(attempt)
+
+    @traced('download_single_stream')
+    def download_single_stream(self, url, writer, segment_size, total_size=0):
+        """Download a URL sequentially through the shared session
+
+        The data is hashed in segment_size blocks, matching the ranges the
+        parallel path would have used. Returns (bytes_written, block_digests,
+        expected_size).
+        """
+        print("⚠️  Server ignores range requests, downloading as a single stream...")
+        headers = self.get_media_headers()
+
+        written = 0
+        digests = []
+        block = hashlib.sha256()
+        block_fill = 0
+        with self.session.get(url, headers=headers, stream=True, timeout=60) as resp:
+            resp.raise_for_status()
+            total_size = total_size or int(resp.headers.get('Content-Length', 0) or 0)
+            writer.truncate(0)
+            sink = writer.range_writer(0)
+            with tqdm(total=total_size or None, unit='B', unit_scale=True, desc="Downloading") as bar:
+                for chunk in resp.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    sink.write(chunk)
+                    written += len(chunk)
+                    bar.update(len(chunk))
+                    view = memoryview(chunk)
+                    while view:
+                        take = min(len(view), segment_size - block_fill)
+                        block.update(view[:take])
+                        block_fill += take
+                        view = view[take:]
+                        if block_fill == segment_size:
+                            digests.append(block.hexdigest())
+                            block, block_fill = hashlib.sha256(), 0
+            sink.flush()
+        if block_fill:
+            digests.append(block.hexdigest())
+        return written, digests, total_size or None
+
+    @traced('download_with_ranges')
+    def download_with_ranges(self, video_url, output_filename="video.mp4", byte_ranges=None,
+                             expected_duration=None):
+        """Download a single-file video in parallel using HTTP Range requests"""
+        writer = None
+        try:
+            print("🚀 Starting segmented download...")
+
+            # Create output directory
+            output_dir = self.config.get('output_directory', 'downloads')
+            Path(output_dir).mkdir(exist_ok=True)
+            output_path = os.path.join(output_dir, output_filename)
+            segment_size = int(self.config.get('range_segment_size_mb', RANGE_SEGMENT_SIZE_MB)) * 1024 * 1024
+            workers = int(self.config.get('range_workers', RANGE_WORKERS))
+
+            final_url, total_size, supports_ranges = self.probe_range_support(video_url)
+            writer = self.open_output(output_path)
+            if not supports_ranges:
+                written, digests, expected_size = self.download_single_stream(
+                    final_url, writer, segment_size, total_size)
+                checksum, ranges = self.ranges_checksum(
+                    self.split_ranges(written, segment_size), digests, segment_size)
+                if not self.finish_output(writer, final_url, 'stream', checksum,
+                                          expected_size=expected_size,
+                                          expected_duration=expected_duration,
+                                          ranges=ranges):
+                    return False
+                print(f"✅ Video downloaded successfully as {output_path}!")
+                return True
+
+            # Byte-range playlists cover the file contiguously from the start,
+            # so only their extent matters; fetch it in regular segments
+            if byte_ranges:
+                total_size = max(end for _, end in byte_ranges) + 1
+            byte_ranges = self.split_ranges(total_size, segment_size)
+
+            print(f"📦 {total_size} bytes in {len(byte_ranges)} ranges, {workers} connections")
+
+            # Preallocate so every range can be written at its own offset
+            with self.trace_span('preallocate', 'disk', bytes=total_size):
+                writer.truncate(total_size)
+
+            ranges_ignored = False
+            range_digests = {}
+            with ThreadPoolExecutor(max_workers=workers) as executor, \
+                    tqdm(total=total_size, unit='B', unit_scale=True, desc="Downloading") as bar:
+                futures = {executor.submit(self.fetch_range, final_url, start, end, writer): (start, end)
+                           for start, end in byte_ranges}
+                try:
+                    for future in as_completed(futures):
+                        result = future.result()
+                        if result is None:
+                            ranges_ignored = True
+                            break
+                        written, digest = result
+                        range_digests[futures[future]] = digest
+                        bar.update(written)
+                finally:
+                    # Leaving the pool waits for queued ranges; drop them if we
+                    # stop early (server ignores ranges or a range failed for good)
+                    for pending in futures:
+                        pending.cancel()
+
+            if ranges_ignored:
+                _, digests, _ = self.download_single_stream(final_url, writer, segment_size, total_size)
+            else:
+                # Ranges complete out of order, so hashes are collected per range
+                digests = [range_digests[byte_range] for byte_range in byte_ranges]
+            checksum, ranges = self.ranges_checksum(byte_ranges, digests, segment_size)
+
+            if not self.finish_output(writer, final_url, 'ranges', checksum,
+                                      expected_size=total_size,
+                                      expected_duration=expected_duration,
+                                      ranges=ranges):
+                return False
+
+            print(f"✅ Video downloaded successfully as {output_path}!")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in segmented download: {e}")
+            if writer is not None:
+                writer.abort()
+            return False
+
+    def download_segmented(self, video_url, output_filename="video.mp4"):
+        """Use the range downloader for direct MP4 and #EXT-X-BYTERANGE sources
+
+        Returns False without downloading anything if the source isn't suitable.
+        """
+        path = urlparse(video_url).path.lower()
+
+        if path.endswith('.mp4'):
+            return self.download_with_ranges(video_url, output_filename)
+
+        if path.endswith('.m3u8'):
+            try:
+                source = self.parse_byterange_playlist(video_url)
+            except requests.RequestException as e:
+                print(f"⚠️  Could not inspect playlist: {e}")
+                return False
+            if source:
+                resource_url, byte_ranges, duration = source
+                print(f"✅ Single-file byte-range playlist detected: {resource_url}")
+                return self.download_with_ranges(resource_url, output_filename, byte_ranges,
+                                                 expected_duration=duration or None)
+
+        return False
+
+    def read_mp4_duration(self, path):
+        """Read the movie duration from the mvhd box
+
+        Only box headers and the moov box are read, never the media data.
+        Returns None if the file has no usable mvhd (e.g. fragmented MP4).
+        """
+        def iter_boxes(f, start, end):
+            offset = start
+            while offset + 8 <= end:
+                f.seek(offset)
+                header = f.read(16)
+                if len(header) < 8:
+                    return
+                box_size, box_type = struct.unpack('>I4s', header[:8])
+                header_size = 8
+                if box_size == 1 and len(header) == 16:
+                    box_size, header_size = struct.unpack('>Q', header[8:16])[0], 16
+                elif box_size == 0:
+                    box_size = end - offset
+                if box_size < header_size:
+                    return
+                yield box_type, offset + header_size, offset + box_size
+                offset += box_size
+
+        with open(path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            for box_type, start, end in iter_boxes(f, 0, file_size):
+                if box_type != b'moov':
+                    continue
+                for child_type, child_start, _ in iter_boxes(f, start, end):
+                    if child_type != b'mvhd':
+                        continue
+                    f.seek(child_start)
+                    mvhd = f.read(32)
+                    if mvhd[:1] == b'\x01':
+                        timescale, duration = struct.unpack('>IQ', mvhd[20:32])
+                    else:
+                        timescale, duration = struct.unpack('>II', mvhd[12:20])
+                    if timescale and duration:
+                        return duration / timescale
+                    return None
+        return None
+
+    def finish_output(self, writer, source_url, method, checksum, **checks):
+        """Verify a staged download if enabled, then move it into place
+
+        A download that fails verification is dropped from the staging
+        directory instead of being committed. The manifest is written once
+        the file is in its final place. Returns True on success.
+        """
+        manifest = None
+        if self.config.get('verify_downloads', True):
+            manifest = self.verify_output(writer.staging_path, writer.final_path, source_url,
+                                          method, checksum, **checks)
+            if not manifest['verified']:
+                writer.abort()
+                return False
+
+        with self.trace_span('commit', 'disk'):
+            writer.commit()
+        if manifest is not None:
+            self.write_manifest(writer.final_path, manifest)
+        return True
+
+    @traced('verify_output')
+    def verify_output(self, staged_path, output_path, source_url, method, checksum, expected_size=None,
+                      expected_duration=None, duration=None, ranges=None):
+        """Check a finished, still staged download and build its manifest
+
+        Everything here comes from the write path or the file's metadata, so
+        the media data is never re-read. Returns the manifest; its
+        "verified" flag says whether the output looks complete.
+        """
+        problems = []
+
+        size = os.path.getsize(staged_path) if os.path.exists(staged_path) else 0
+        if size == 0:
+            problems.append("output file is empty")
+        elif expected_size is not None and size != expected_size:
+            problems.append(f"size {size} != expected {expected_size}")
+
+        if duration is None and method != 'ffmpeg' and size:
+            try:
+                duration = self.read_mp4_duration(staged_path)
+            except (IOError, struct.error):
+                duration = None
+        if expected_duration and duration is not None:
+            if abs(duration - expected_duration) > DURATION_TOLERANCE_SECONDS:
+                problems.append(f"duration {duration:.1f}s != playlist {expected_duration:.1f}s")
+        if not checksum.get('digest'):
+            # e.g. ffmpeg didn't produce its hash output
+            problems.append("no checksum recorded")
+
+        manifest = {
+            "file": os.path.basename(output_path),
+            "size": size,
+            "source": source_url,
+            "method": method,
+            "checksum": checksum,
+            "duration": duration,
+            "expected_duration": expected_duration,
+            "verified": not problems,
+            "problems": problems,
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        }
+        if ranges:
+            manifest["ranges"] = ranges
+
+        if problems:
+            print(f"❌ Verification failed for {output_path}: {'; '.join(problems)}")
+        else:
+            print(f"🔒 Verified {output_path} ({checksum['algorithm']}: {checksum['digest']})")
+        return manifest
+
+    def write_manifest(self, output_path, manifest):
+        """Write the sidecar manifest next to an output file"""
+        try:
+            with open(output_path + MANIFEST_SUFFIX, 'w') as f:
+                json.dump(manifest, f, indent=4)
+        except IOError as e:
+            print(f"⚠️  Could not write manifest: {e}")
+
+    def load_manifest(self, output_path):
+        """Load the sidecar manifest for an output file, or None"""
+        try:
+            with open(output_path + MANIFEST_SUFFIX, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def verify_archive(self, directory=None):
+        """Check every download in a directory against its manifest
+
+        Uses only the manifests and file sizes, so thousands of files can be
+        checked without reading them. Returns a dict with the verified,
+        failed and unmanifested files, and groups of duplicates by checksum.
+        """
+        directory = directory or self.config.get('output_directory', 'downloads')
+        report = {"verified": [], "failed": [], "missing_manifest": [], "duplicates": {}}
+        by_checksum = {}
+
+        for entry in sorted(Path(directory).iterdir()):
+            if not entry.is_file() or entry.name.endswith(MANIFEST_SUFFIX):
+                continue
+            manifest = self.load_manifest(str(entry))
+            if manifest is None:
+                report["missing_manifest"].append(str(entry))
+                continue
+            if not manifest.get("verified") or entry.stat().st_size != manifest.get("size"):
+                report["failed"].append(str(entry))
+                continue
+            report["verified"].append(str(entry))
+            checksum = manifest.get("checksum") or {}
+            if checksum.get("digest"):
+                key = f"{checksum.get('algorithm')}/{checksum.get('block_size', '')}:{checksum['digest']}"
+                by_checksum.setdefault(key, []).append(str(entry))
+
+        report["duplicates"] = {key: files for key, files in by_checksum.items() if len(files) > 1}
+
+        print(f"🔒 {len(report['verified'])} verified, {len(report['failed'])} failed, "
+              f"{len(report['missing_manifest'])} without manifest, "
+              f"{len(report['duplicates'])} duplicate groups")
+        return report
+
+    @traced('validate_video_url')
     def validate_video_url(self, video_url):
         """Validate and potentially extract video URL from GeeksforGeeks page"""
         if video_url.endswith('.m3u8'):
@@ -427,8 +1394,8 @@ class GFGDownloader:
         print("✅ Using provided URL directly")
         return video_url
     
-    def get_user_input(self):
-        """Get video URL and filename from user"""
+    def get_video_url_input(self):
+        """Get video URL from user"""
         print("🎬 GeeksforGeeks HLS Video Downloader")
         print("=" * 50)
         
@@ -447,6 +1414,12 @@ class GFGDownloader:
             
             break
         
+        return video_url
+    
+    def get_user_input(self):
+        """Get video URL and filename from user"""
+        video_url = self.get_video_url_input()
+        
         # Get output filename from user
         while True:
             filename = input("\n📁 Enter the output filename (without extension, or press Enter for auto): ").strip()
@@ -469,6 +1442,48 @@ class GFGDownloader:
         
         return video_url, filename
     
+    @traced('download_resolved')
+    def download_resolved(self, final_video_url, output_filename=None, overall_progress=None):
+        """Download an already resolved video URL, falling back between methods"""
+        # Direct MP4 and byte-range playlists can be fetched in parallel ranges
+        if self.config.get('segmented_download', True):
+            if self.download_segmented(final_video_url, output_filename or "video.mp4"):
+                return True
+
+        preferred_downloader = self.config.get('preferred_downloader', 'yt-dlp')
+        
+        if preferred_downloader == 'yt-dlp':
+            if overall_progress:
+                overall_progress.set_description("Downloading with yt-dlp")
+                overall_progress.update(40)
+        
+            success = self.download_with_ytdlp(final_video_url, output_filename)
+        
+            if not success:
+                print("❌ yt-dlp failed, trying ffmpeg...")
+                if overall_progress:
+                    overall_progress.set_description("Trying ffmpeg")
+                    overall_progress.update(60)
+        
+                success = self.download_with_ffmpeg(final_video_url, output_filename or "video.mp4")
+        else:
+            if overall_progress:
+                overall_progress.set_description("Downloading with ffmpeg")
+                overall_progress.update(40)
+        
+            success = self.download_with_ffmpeg(final_video_url, output_filename or "video.mp4")
+        
+            if not success:
+                print("❌ ffmpeg failed, trying yt-dlp...")
+                if overall_progress:
+                    overall_progress.set_description("Trying yt-dlp")
+                    overall_progress.update(60)
+        
+                success = self.download_with_ytdlp(final_video_url, output_filename)
+        
+        return success
+
+    @traced_job
     def download_video(self, video_url, output_filename=None):
         """Main download function"""
         try:
@@ -503,37 +1518,7 @@ class GFGDownloader:
             if overall_progress:
                 overall_progress.update(30)
             
-            # Try downloading with preferred method
-            preferred_downloader = self.config.get('preferred_downloader', 'yt-dlp')
-            
-            if preferred_downloader == 'yt-dlp':
-                if overall_progress:
-                    overall_progress.set_description("Downloading with yt-dlp")
-                    overall_progress.update(40)
-                
-                success = self.download_with_ytdlp(final_video_url, output_filename)
-                
-                if not success:
-                    print("❌ yt-dlp failed, trying ffmpeg...")
-                    if overall_progress:
-                        overall_progress.set_description("Trying ffmpeg")
-                        overall_progress.update(60)
-                    
-                    success = self.download_with_ffmpeg(final_video_url, output_filename or "video.mp4")
-            else:
-                if overall_progress:
-                    overall_progress.set_description("Downloading with ffmpeg")
-                    overall_progress.update(40)
-                
-                success = self.download_with_ffmpeg(final_video_url, output_filename or "video.mp4")
-                
-                if not success:
-                    print("❌ ffmpeg failed, trying yt-dlp...")
-                    if overall_progress:
-                        overall_progress.set_description("Trying yt-dlp")
-                        overall_progress.update(60)
-                    
-                    success = self.download_with_ytdlp(final_video_url, output_filename)
+            success = self.download_resolved(final_video_url, output_filename, overall_progress)
             
             if success:
                 print("✅ Download completed successfully!")
@@ -571,11 +1556,301 @@ class GFGDownloader:
                 overall_progress.close()
             return False
 
+    @traced('resolve_video')
+    def resolve_video(self, video_url):
+        """Resolve a page URL to its video URL and prefetch its playlist
+
+        Returns (final_video_url, resolved_at); final_video_url is None if
+        the page couldn't be resolved.
+        """
+        try:
+            final_video_url = self.validate_video_url(video_url)
+            if final_video_url and urlparse(final_video_url).path.lower().endswith('.m3u8'):
+                self.fetch_media_playlist(final_video_url)
+        except Exception as e:
+            print(f"❌ Error resolving {video_url}: {e}")
+            final_video_url = None
+        return final_video_url, time.time()
+
+    def prefetch_video(self, video_url, claimed, max_age):
+        """Resolve video_url ahead of time and keep it fresh until it is claimed
+
+        Downloads often take longer than max_age, so an unclaimed resolution
+        is redone every max_age / 2 seconds; whatever is returned once the
+        claimed event is set is never much older than that.
+        """
+        result = self.resolve_video(video_url)
+        refresh_interval = max_age / 2 if max_age > 0 else None
+        while result[0] and not claimed.wait(refresh_interval):
+            result = self.resolve_video(video_url)
+        return result
+
+    @traced_job
+    def download_videos(self, video_urls, output_filenames=None):
+        """Download several videos, resolving upcoming pages during each download
+
+        Logs in once for the whole batch. At most prefetch_lookahead videos
+        are resolved ahead of the current one and kept fresh until they are
+        used; a resolution that is still older than prefetch_max_age_seconds
+        is redone so signed URLs don't expire before use. Returns a list of
+        success flags in the same order as video_urls.
+        """
+        output_filenames = output_filenames or [None] * len(video_urls)
+        lookahead = max(1, int(self.config.get('prefetch_lookahead', PREFETCH_LOOKAHEAD)))
+        max_age = self.config.get('prefetch_max_age_seconds', PREFETCH_MAX_AGE_SECONDS)
+        results = []
+
+        if not self.login():
+            print("❌ Login failed!")
+            return [False] * len(video_urls)
+
+        # Not a `with` block: on Ctrl-C its exit would wait for every queued resolution.
+        # One worker per prefetched video, as each stays busy refreshing until claimed
+        resolver = ThreadPoolExecutor(max_workers=lookahead + 1)
+        pending = deque()
+        next_index = 0
+        try:
+            for i, (video_url, output_filename) in enumerate(zip(video_urls, output_filenames), 1):
+                # Keep the current video and the next `lookahead` ones resolving
+                while next_index < len(video_urls) and next_index < i + lookahead:
+                    claimed = threading.Event()
+                    pending.append((resolver.submit(self.prefetch_video, video_urls[next_index],
+                                                    claimed, max_age), claimed))
+                    next_index += 1
+
+                future, claimed = pending.popleft()
+                claimed.set()
+                final_video_url, resolved_at = future.result()
+
+                print(f"\n📹 Downloading video {i}/{len(video_urls)}")
+                if final_video_url and time.time() - resolved_at > max_age:
+                    print("🔄 Resolved URL is stale, resolving again...")
+                    final_video_url, _ = self.resolve_video(video_url)
+
+                if not final_video_url:
+                    print("❌ Could not get valid video URL!")
+                    results.append(False)
+                    continue
+
+                print(f"📹 Using video URL: {final_video_url}")
+                success = self.download_resolved(final_video_url, output_filename)
+                if success:
+                    print(f"✅ Video {i} downloaded successfully!")
+                else:
+                    print(f"❌ Video {i} download failed!")
+                results.append(success)
+
+        except KeyboardInterrupt:
+            print("\n\n⏹️  Download cancelled by user")
+            results.extend([False] * (len(video_urls) - len(results)))
+        finally:
+            # Release prefetches still refreshing; resolutions already
+            # running finish in the background
+            for future, claimed in pending:
+                future.cancel()
+                claimed.set()
+            resolver.shutdown(wait=False)
+
+        print(f"\n📊 {sum(results)}/{len(video_urls)} videos downloaded")
+
+        # Logout
+        print("\n🚪 Logging out...")
+        self.logout()
+        print("✅ Logged out successfully!")
+
+        return results
+
+    def parse_media_segments(self, playlist_url, content):
+        """List (uri, duration, byterange_length) for each segment of a media playlist"""
+        segments = []
+        duration = length = None
+        for line in content.splitlines():
+            line = line.strip()
+            if line.startswith('#EXTINF:'):
+                duration = float(line[len('#EXTINF:'):].split(',')[0] or 0)
+            elif line.startswith('#EXT-X-BYTERANGE:'):
+                length = int(line.split(':', 1)[1].partition('@')[0])
+            elif line and not line.startswith('#'):
+                segments.append((urljoin(playlist_url, line), duration or 0.0, length))
+                duration = length = None
+        return segments
+
+    @traced('estimate_rendition')
+    def estimate_rendition(self, playlist_url, bandwidth=0, content=None):
+        """Estimate the size and duration of one media playlist
+
+        Byte-range playlists are summed exactly. Otherwise a few segments
+        spread over the playlist are probed with HEAD and their bytes per
+        second extrapolated, falling back to the advertised bandwidth.
+        """
+        if content is None:
+            resp = self.session.get(playlist_url, headers=self.get_media_headers(), timeout=30)
+            resp.raise_for_status()
+            playlist_url, content = resp.url or playlist_url, resp.text
+
+        segments = self.parse_media_segments(playlist_url, content)
+        duration = sum(seg_duration for _, seg_duration, _ in segments)
+        estimate = {"duration": duration, "segments": len(segments), "estimated_bytes": None, "method": None}
+        if not segments:
+            return estimate
+
+        if all(length is not None for _, _, length in segments):
+            init = re.search(r'#EXT-X-MAP:.*BYTERANGE="(\d+)', content)
+            total = sum(length for _, _, length in segments) + (int(init.group(1)) if init else 0)
+            estimate.update(estimated_bytes=total, method="byterange")
+            return estimate
+
+        samples = max(1, min(len(segments), int(self.config.get('estimate_sample_segments', ESTIMATE_SAMPLE_SEGMENTS))))
+        picks = sorted({round(i * (len(segments) - 1) / max(1, samples - 1)) for i in range(samples)})
+        sampled_bytes = sampled_duration = 0
+        for index in picks:
+            uri, seg_duration, _ = segments[index]
+            try:
+                size = self.probe_range_support(uri)[1]
+            except requests.RequestException as e:
+                print(f"⚠️  Could not probe segment {uri}: {e}")
+                continue
+            # Failed probes report no size and are left out of the sample
+            if size:
+                sampled_bytes += size
+                sampled_duration += seg_duration
+
+        if sampled_bytes and sampled_duration:
+            estimate.update(estimated_bytes=int(sampled_bytes / sampled_duration * duration), method="sampled")
+        elif bandwidth:
+            estimate.update(estimated_bytes=int(bandwidth / 8 * duration), method="bandwidth")
+        return estimate
+
+    @traced('estimate_video')
+    def estimate_video(self, video_url):
+        """Resolve one video and estimate each rendition without downloading media
+
+        Returns a dict with the resolved URL, the renditions found and the
+        duration and size of the one that would be downloaded.
+        """
+        result = {"url": video_url, "video_url": None, "duration": None, "estimated_bytes": None,
+                  "renditions": [], "error": None}
+        try:
+            final_video_url = self.validate_video_url(video_url)
+            if not final_video_url:
+                result["error"] = "could not resolve video URL"
+                return result
+            result["video_url"] = final_video_url
+            renditions = result["renditions"]
+
+            if urlparse(final_video_url).path.lower().endswith('.m3u8'):
+                resp = self.session.get(final_video_url, headers=self.get_media_headers(), timeout=30)
+                resp.raise_for_status()
+                playlist_url, content = resp.url or final_video_url, resp.text
+
+                if '#EXT-X-STREAM-INF' in content:
+                    variants, media = self.parse_master_playlist(playlist_url, content)
+                    for variant in variants:
+                        name = variant['resolution'] or tqdm.format_sizeof(variant['bandwidth'], 'bps', 1000)
+                        renditions.append({"type": "video", "name": name, "bandwidth": variant['bandwidth'],
+                                           "audio": variant['audio'],
+                                           **self.estimate_rendition(variant['uri'], variant['bandwidth'])})
+                    for item in media:
+                        if item['type'] == 'audio':
+                            renditions.append({"type": "audio", "name": item['name'], "group": item['group'],
+                                               "default": item['default'],
+                                               **self.estimate_rendition(item['uri'])})
+                else:
+                    renditions.append({"type": "video", "name": "default", "bandwidth": 0, "audio": None,
+                                       **self.estimate_rendition(playlist_url, content=content)})
+            else:
+                _, size, _ = self.probe_range_support(final_video_url)
+                renditions.append({"type": "video", "name": "direct", "bandwidth": 0, "audio": None,
+                                   "duration": None, "segments": 1, "estimated_bytes": size or None,
+                                   "method": "content-length" if size else None})
+
+            videos = [rendition for rendition in renditions if rendition['type'] == 'video']
+            if videos:
+                selected = self.select_variant(videos)
+                selected['selected'] = True
+                total = selected['estimated_bytes']
+                # Separate audio is downloaded with the variant's default rendition
+                group = [r for r in renditions if r['type'] == 'audio' and r['group'] == selected['audio']]
+                if group and total is not None:
+                    audio = next((r for r in group if r['default']), group[0])
+                    audio['selected'] = True
+                    total = total + audio['estimated_bytes'] if audio['estimated_bytes'] is not None else None
+                result.update(duration=selected['duration'], estimated_bytes=total)
+
+        except Exception as e:
+            print(f"❌ Error estimating {video_url}: {e}")
+            result["error"] = str(e)
+        return result
+
+    @traced_job
+    def estimate_videos(self, video_urls):
+        """Dry run: estimate size and duration of videos without downloading them
+
+        Logs in once, then resolves and estimates up to estimate_workers
+        videos at a time, fetching only playlists and a HEAD request per
+        sampled segment. Returns one estimate dict per URL.
+        """
+        if not self.login():
+            print("❌ Login failed!")
+            return []
+
+        workers = max(1, int(self.config.get('estimate_workers', ESTIMATE_WORKERS)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(self.estimate_video, video_urls))
+
+        self.print_estimates(results)
+
+        # Logout
+        print("\n🚪 Logging out...")
+        self.logout()
+        print("✅ Logged out successfully!")
+
+        return results
+
+    def print_estimates(self, results):
+        """Print a dry-run report"""
+        def describe(size, duration):
+            size_text = tqdm.format_sizeof(size, 'B', 1024) if size is not None else "unknown size"
+            duration_text = (f"{int(duration // 3600)}:{int(duration % 3600 // 60):02d}:{int(duration % 60):02d}"
+                             if duration else "unknown duration")
+            return f"{size_text}, {duration_text}"
+
+        print("\n📋 Dry run estimate")
+        print("=" * 50)
+        for result in results:
+            print(f"\n📹 {result['url']}")
+            if result['error']:
+                print(f"   ❌ {result['error']}")
+                continue
+            for rendition in result['renditions']:
+                marker = "➡️ " if rendition.get('selected') else "   "
+                method = f" ({rendition['method']})" if rendition['method'] else ""
+                print(f"   {marker}{rendition['type']} {rendition['name']}: "
+                      f"{describe(rendition['estimated_bytes'], rendition['duration'])}{method}")
+
+        estimated = [r for r in results if not r['error']]
+        total_bytes = sum(r['estimated_bytes'] or 0 for r in estimated)
+        total_duration = sum(r['duration'] or 0 for r in estimated)
+        unknown = sum(1 for r in estimated if r['estimated_bytes'] is None)
+        print(f"\n📊 Total for {len(estimated)}/{len(results)} videos: {describe(total_bytes, total_duration)}")
+        if unknown:
+            print(f"⚠️  {unknown} videos have no size estimate")
+
 def main():
     """Main function"""
     try:
         downloader = GFGDownloader()
         
+        # Dry run: estimate size and duration only, for URLs given on the command line
+        if '--dry-run' in sys.argv[1:]:
+            video_urls = [arg for arg in sys.argv[1:] if arg != '--dry-run']
+            if not video_urls:
+                video_urls = [downloader.get_video_url_input()]
+            results = downloader.estimate_videos(video_urls)
+            if not results or any(result['error'] for result in results):
+                sys.exit(1)
+            return
+        
         # Get user input
         video_url, output_filename = downloader.get_user_input()
         
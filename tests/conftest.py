@@ -0,0 +1,109 @@
+"""Shared fixtures for the downloader tests"""
+
+import http.server
+import io
+import json
+import os
+import re
+import struct
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_mp4(size):
+    """Minimal MP4 (ftyp + moov/mvhd + mdat) of exactly size bytes, 40s long"""
+    def box(box_type, payload):
+        return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+    mvhd = box(b'mvhd', b'\x00\x00\x00\x00' + struct.pack('>IIII', 0, 0, 1000, 40000) + b'\x00' * 80)
+    data = box(b'ftyp', b'isom\x00\x00\x02\x00') + box(b'moov', mvhd)
+    return data + box(b'mdat', os.urandom(size - len(data) - 8))
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Serves server.files; server.mode is 'ranges', 'ignore', 'short' or 'fail_first'
+
+    Every request is logged in server.requests as (method, path, range).
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def respond(self, send_body):
+        self.server.requests.append((self.command, self.path, self.headers.get('Range')))
+        data = self.server.files.get(self.path.split('?')[0])
+        if data is None:
+            self.send_error(404)
+            return
+
+        mode = self.server.mode
+        match = re.match(r'bytes=(\d+)-(\d*)', self.headers.get('Range', ''))
+        if match and mode == 'fail_first' and match.group(1) == '0':
+            self.send_error(500)
+            return
+        if match and mode != 'ignore':
+            start = int(match.group(1))
+            end = int(match.group(2) or len(data) - 1)
+            body = data[start:end + 1]
+            if mode == 'short' and len(body) > 1:
+                body = body[:len(body) // 2]
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        else:
+            body = data
+            self.send_response(200)
+
+        if mode != 'ignore':
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+
+@pytest.fixture
+def range_server():
+    """Threaded HTTP server on localhost; yields it with .files, .mode and .url()"""
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    server.daemon_threads = True
+    server.files = {}
+    server.mode = 'ranges'
+    server.requests = []
+    server.url = lambda path: f'http://127.0.0.1:{server.server_address[1]}{path}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def downloader(tmp_path, monkeypatch):
+    """GFGDownloader with its config, output and staging dirs under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    config = {
+        "email": "user@example.com",
+        "password": "secret",
+        "output_directory": str(tmp_path / "out"),
+        "staging_directory": str(tmp_path / "staging"),
+        "range_segment_size_mb": 1,
+        "custom_headers": {}
+    }
+    with open(tmp_path / "config.json", 'w') as f:
+        json.dump(config, f)
+
+    import gfg_hls_downloader
+    return gfg_hls_downloader.GFGDownloader()
@@ -0,0 +1,118 @@
+"""Pipelined batch mode"""
+
+import threading
+import time
+
+
+def test_cancel_does_not_wait_for_queued_resolutions(downloader, monkeypatch):
+    release = threading.Event()
+
+    def resolve_video(video_url):
+        # Everything after the first video hangs until the test releases it
+        if not video_url.endswith('/0'):
+            release.wait(10)
+        return video_url, time.time()
+
+    def download_resolved(final_video_url, output_filename=None, overall_progress=None):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(downloader, 'login', lambda: True)
+    monkeypatch.setattr(downloader, 'logout', lambda: True)
+    monkeypatch.setattr(downloader, 'resolve_video', resolve_video)
+    monkeypatch.setattr(downloader, 'download_resolved', download_resolved)
+    downloader.config['prefetch_lookahead'] = 1
+
+    started = time.monotonic()
+    try:
+        results = downloader.download_videos([f'https://example.com/{i}' for i in range(4)])
+    finally:
+        release.set()
+
+    assert results == [False] * 4
+    assert time.monotonic() - started < 5
+
+
+def batch_downloader(downloader, monkeypatch, resolve_video, download_resolved):
+    monkeypatch.setattr(downloader, 'login', lambda: True)
+    monkeypatch.setattr(downloader, 'logout', lambda: True)
+    monkeypatch.setattr(downloader, 'resolve_video', resolve_video)
+    monkeypatch.setattr(downloader, 'download_resolved', download_resolved)
+    return downloader
+
+
+def test_lookahead_is_bounded(downloader, monkeypatch):
+    started = []
+    lock = threading.Lock()
+    seen = []
+
+    def resolve_video(video_url):
+        with lock:
+            started.append(video_url)
+        return video_url, time.time()
+
+    def download_resolved(final_video_url, output_filename=None, overall_progress=None):
+        # Give the resolver time to run as far ahead as it is allowed to
+        time.sleep(0.2)
+        with lock:
+            seen.append(len(started))
+        return True
+
+    batch_downloader(downloader, monkeypatch, resolve_video, download_resolved)
+    downloader.config['prefetch_lookahead'] = 2
+
+    urls = [f'https://example.com/{i}' for i in range(6)]
+    assert downloader.download_videos(urls) == [True] * 6
+
+    # While video k downloads, videos up to k + 2 have been resolved, never more
+    assert seen == [min(6, k + 3) for k in range(6)]
+    assert started == urls
+
+
+def test_prefetch_is_refreshed_during_a_long_download(downloader, monkeypatch):
+    resolutions = {}
+    lock = threading.Lock()
+    used = []
+
+    def resolve_video(video_url):
+        with lock:
+            resolutions[video_url] = resolutions.get(video_url, 0) + 1
+            return f'{video_url}?v={resolutions[video_url]}', time.time()
+
+    def download_resolved(final_video_url, output_filename=None, overall_progress=None):
+        used.append(final_video_url)
+        if final_video_url.startswith('https://example.com/0'):
+            # Outlasts prefetch_max_age_seconds several times over
+            time.sleep(1)
+        return True
+
+    batch_downloader(downloader, monkeypatch, resolve_video, download_resolved)
+    downloader.config.update(prefetch_lookahead=1, prefetch_max_age_seconds=0.4)
+
+    assert downloader.download_videos(['https://example.com/0', 'https://example.com/1']) == [True, True]
+
+    assert resolutions['https://example.com/1'] >= 3
+    assert used[1] == f'https://example.com/1?v={resolutions["https://example.com/1"]}'
+
+
+def test_stale_resolution_is_resolved_again(downloader, monkeypatch):
+    calls = []
+
+    def resolve_video(video_url):
+        calls.append(video_url)
+        # The first resolution comes back already expired
+        resolved_at = time.time() - (1000 if len(calls) == 1 else 0)
+        return f'{video_url}?v={len(calls)}', resolved_at
+
+    used = []
+
+    def download_resolved(final_video_url, output_filename=None, overall_progress=None):
+        used.append(final_video_url)
+        return True
+
+    batch_downloader(downloader, monkeypatch, resolve_video, download_resolved)
+    downloader.config['prefetch_max_age_seconds'] = 300
+
+    assert downloader.download_videos(['https://example.com/0']) == [True]
+
+    assert calls == ['https://example.com/0'] * 2
+    assert used == ['https://example.com/0?v=2']
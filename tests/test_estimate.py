@@ -0,0 +1,52 @@
+"""Dry-run size and duration estimation"""
+
+
+def playlist(segment_names, duration=10.0):
+    lines = ['#EXTM3U', f'#EXT-X-TARGETDURATION:{int(duration)}']
+    for name in segment_names:
+        lines += [f'#EXTINF:{duration},', name]
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines)
+
+
+def test_sampled_segment_sizes(range_server, downloader):
+    names = [f'seg{i}.ts' for i in range(10)]
+    for name in names:
+        range_server.files['/' + name] = b'x' * 5000
+
+    estimate = downloader.estimate_rendition(range_server.url('/media.m3u8'), content=playlist(names))
+
+    assert estimate == {"duration": 100.0, "segments": 10, "estimated_bytes": 50000, "method": "sampled"}
+
+
+def test_failed_segment_probes_fall_back_to_bandwidth(range_server, downloader):
+    # None of the segments exist, so every probe gets a 404 error page
+    names = [f'missing{i}.ts' for i in range(10)]
+
+    estimate = downloader.estimate_rendition(range_server.url('/media.m3u8'), bandwidth=800000,
+                                             content=playlist(names))
+
+    assert estimate['method'] == 'bandwidth'
+    assert estimate['estimated_bytes'] == 800000 // 8 * 100
+
+
+def test_failed_probe_reports_no_size(range_server, downloader):
+    _, size, supports_ranges = downloader.probe_range_support(range_server.url('/missing.mp4'))
+
+    assert size == 0
+    assert not supports_ranges
+
+
+def test_dry_run_prompts_for_url_only(downloader, monkeypatch):
+    import gfg_hls_downloader
+
+    prompts = []
+    monkeypatch.setattr('builtins.input', lambda prompt: prompts.append(prompt) or 'https://example.com/v.m3u8')
+    monkeypatch.setattr(gfg_hls_downloader, 'GFGDownloader', lambda: downloader)
+    monkeypatch.setattr(downloader, 'estimate_videos', lambda urls: [{"error": None, "url": urls[0]}])
+    monkeypatch.setattr(gfg_hls_downloader.sys, 'argv', ['gfg_hls_downloader.py', '--dry-run'])
+
+    gfg_hls_downloader.main()
+
+    assert len(prompts) == 1
+    assert 'video URL' in prompts[0]
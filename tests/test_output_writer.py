@@ -0,0 +1,83 @@
+"""Staging, commit and cleanup behaviour of OutputWriter"""
+
+import os
+
+import pytest
+
+import gfg_hls_downloader
+from conftest import make_mp4
+
+
+def test_staging_directory_is_created(tmp_path):
+    staging = tmp_path / "missing" / "staging"
+    writer = gfg_hls_downloader.OutputWriter(str(tmp_path / "video.mp4"), staging_dir=str(staging))
+
+    assert os.path.dirname(writer.staging_path) == str(staging)
+    writer.abort()
+    assert os.listdir(staging) == []
+
+
+def test_failed_verification_is_not_committed(range_server, downloader):
+    video = make_mp4(2 * 1024 * 1024)
+    range_server.files['/video.mp4'] = video
+    # The playlist claims 80s but the mvhd box says 40s
+    range_server.files['/media.m3u8'] = '\n'.join([
+        '#EXTM3U', '#EXT-X-TARGETDURATION:80',
+        '#EXTINF:80.0,', f'#EXT-X-BYTERANGE:{len(video)}@0', 'video.mp4',
+        '#EXT-X-ENDLIST'
+    ]).encode()
+
+    assert not downloader.download_segmented(range_server.url('/media.m3u8'), 'video.mp4')
+
+    assert os.listdir(downloader.config['output_directory']) == []
+    assert os.listdir(downloader.config['staging_directory']) == []
+
+
+def test_failed_cross_filesystem_commit_leaves_no_partial_file(tmp_path, monkeypatch):
+    final_path = tmp_path / "out" / "video.mp4"
+    final_path.parent.mkdir()
+    writer = gfg_hls_downloader.OutputWriter(str(final_path), staging_dir=str(tmp_path / "staging"))
+    writer.write_at(0, b'data')
+
+    def fail_replace(src, dst):
+        raise OSError("cross-device link")
+    monkeypatch.setattr(gfg_hls_downloader.os, 'replace', fail_replace)
+
+    with pytest.raises(OSError):
+        writer.commit()
+
+    assert os.listdir(final_path.parent) == []
+    monkeypatch.undo()
+    writer.abort()
+
+
+def test_committed_file_gets_umask_mode(tmp_path):
+    final_path = tmp_path / "video.mp4"
+    writer = gfg_hls_downloader.OutputWriter(str(final_path), staging_dir=str(tmp_path / "staging"))
+    writer.write_at(0, b'data')
+    writer.commit()
+
+    assert os.stat(final_path).st_mode & 0o777 == gfg_hls_downloader.OutputWriter.file_mode
+    assert gfg_hls_downloader.OutputWriter.file_mode == 0o666 & ~gfg_hls_downloader.read_umask()
+
+
+def test_short_writes_are_retried(tmp_path):
+    class ShortWriteFile:
+        """Writes at most 3 bytes per call, like a raw write on a busy NFS mount"""
+        def __init__(self, f):
+            self.f = f
+
+        def write(self, data):
+            return self.f.write(data[:3])
+
+        def __getattr__(self, name):
+            return getattr(self.f, name)
+
+    final_path = tmp_path / "video.mp4"
+    writer = gfg_hls_downloader.OutputWriter(str(final_path), staging_dir=str(tmp_path / "staging"))
+    writer.truncate(20)
+    writer.file = ShortWriteFile(writer.file)
+    writer.write_at(4, b'0123456789')
+    writer.commit()
+
+    assert final_path.read_bytes() == b'\0' * 4 + b'0123456789' + b'\0' * 6
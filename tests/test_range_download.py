@@ -0,0 +1,85 @@
+"""Segmented range downloads against a local range-capable server"""
+
+import os
+
+import gfg_hls_downloader
+from conftest import make_mp4
+
+VIDEO_SIZE = 3 * 1024 * 1024 + 12345
+
+
+def read_output(downloader, filename):
+    with open(os.path.join(downloader.config['output_directory'], filename), 'rb') as f:
+        return f.read()
+
+
+def test_parallel_range_download_matches_source(range_server, downloader):
+    video = make_mp4(VIDEO_SIZE)
+    range_server.files['/video.mp4'] = video
+
+    assert downloader.download_segmented(range_server.url('/video.mp4'), 'video.mp4')
+
+    assert read_output(downloader, 'video.mp4') == video
+    manifest = downloader.load_manifest(os.path.join(downloader.config['output_directory'], 'video.mp4'))
+    assert manifest['verified']
+    assert manifest['method'] == 'ranges'
+    assert len(manifest['ranges']) == 4
+
+
+def test_server_ignoring_ranges_falls_back_to_single_stream(range_server, downloader):
+    video = make_mp4(VIDEO_SIZE)
+    range_server.files['/video.mp4'] = video
+    range_server.mode = 'ignore'
+
+    assert downloader.download_segmented(range_server.url('/video.mp4'), 'video.mp4')
+
+    assert read_output(downloader, 'video.mp4') == video
+    manifest = downloader.load_manifest(os.path.join(downloader.config['output_directory'], 'video.mp4'))
+    assert manifest['method'] == 'stream'
+
+
+def test_byterange_playlist(range_server, downloader):
+    video = make_mp4(VIDEO_SIZE)
+    range_server.files['/video.mp4'] = video
+
+    # 11 segments whose #EXTINF durations add up to the 40s in the mvhd box
+    init_size = 1000
+    lines = ['#EXTM3U', '#EXT-X-VERSION:7', '#EXT-X-TARGETDURATION:4',
+             f'#EXT-X-MAP:URI="video.mp4",BYTERANGE="{init_size}@0"']
+    offset = init_size
+    while offset < len(video):
+        length = min(300000, len(video) - offset)
+        lines += [f'#EXTINF:{40 / 11:.6f},', f'#EXT-X-BYTERANGE:{length}@{offset}', 'video.mp4']
+        offset += length
+    lines.append('#EXT-X-ENDLIST')
+    range_server.files['/media.m3u8'] = '\n'.join(lines).encode()
+
+    assert downloader.download_segmented(range_server.url('/media.m3u8'), 'hls.mp4')
+
+    assert read_output(downloader, 'hls.mp4') == video
+
+
+def test_short_ranges_exhaust_retries(range_server, downloader, monkeypatch):
+    range_server.files['/video.mp4'] = make_mp4(VIDEO_SIZE)
+    range_server.mode = 'short'
+    monkeypatch.setattr(gfg_hls_downloader.time, 'sleep', lambda seconds: None)
+
+    assert not downloader.download_segmented(range_server.url('/video.mp4'), 'video.mp4')
+
+    assert not os.path.exists(os.path.join(downloader.config['output_directory'], 'video.mp4'))
+    assert os.listdir(downloader.config['staging_directory']) == []
+
+
+def test_failed_range_cancels_queued_ranges(range_server, downloader, monkeypatch):
+    range_server.files['/video.mp4'] = make_mp4(20 * 1024 * 1024)
+    range_server.mode = 'fail_first'
+    downloader.config['range_workers'] = 2
+    monkeypatch.setattr(gfg_hls_downloader.time, 'sleep', lambda seconds: None)
+
+    assert not downloader.download_segmented(range_server.url('/video.mp4'), 'video.mp4')
+
+    # Range 0 fails RANGE_RETRIES times; the other worker may finish a few
+    # ranges meanwhile, but the 20 queued ones must not all be fetched
+    range_gets = [r for r in range_server.requests if r[0] == 'GET' and r[2]]
+    assert len(range_gets) < 12
+    assert os.listdir(downloader.config['staging_directory']) == []
@@ -0,0 +1,71 @@
+"""Chrome trace export of download jobs"""
+
+import json
+import os
+
+from conftest import make_mp4
+
+
+def traced_download(range_server, downloader, monkeypatch, filename='video.mp4'):
+    """Run download_video against the local server without logging in"""
+    monkeypatch.setattr(downloader, 'login', lambda: True)
+    monkeypatch.setattr(downloader, 'logout', lambda: None)
+    return downloader.download_video(range_server.url('/video.mp4'), filename)
+
+
+def test_traced_download_exports_spans(range_server, downloader, monkeypatch, tmp_path):
+    range_server.files['/video.mp4'] = make_mp4(3 * 1024 * 1024)
+    downloader.config.update(trace_downloads=True, trace_directory=str(tmp_path / "traces"))
+
+    assert traced_download(range_server, downloader, monkeypatch)
+    assert downloader.tracer is None
+
+    traces = os.listdir(tmp_path / "traces")
+    assert len(traces) == 1 and traces[0].startswith('download_video-')
+    with open(tmp_path / "traces" / traces[0]) as f:
+        events = json.load(f)['traceEvents']
+
+    spans = [event for event in events if event['ph'] == 'X']
+    assert [span['name'] for span in spans if span['cat'] == 'job'] == ['download_video']
+    names = {span['name'] for span in spans}
+    assert {'download_with_ranges', 'probe_range_support', 'verify_output', 'commit', 'ttfb', 'transfer'} <= names
+
+    fetches = [span for span in spans if span['name'] == 'fetch_range']
+    assert len(fetches) == 3
+    assert sorted(span['args']['start'] for span in fetches) == [0, 1024 * 1024, 2 * 1024 * 1024]
+    for span in fetches:
+        assert {'ttfb_ms', 'transfer_ms', 'disk_ms'} <= set(span['args'])
+        assert span['dur'] >= 0
+
+    thread_names = {event['tid']: event['args']['name'] for event in events if event['ph'] == 'M'}
+    assert {span['tid'] for span in spans} <= set(thread_names)
+    assert all(thread_names[span['tid']] != 'MainThread' for span in fetches)
+
+
+def test_jobs_in_the_same_second_keep_their_traces(range_server, downloader, monkeypatch, tmp_path):
+    range_server.files['/video.mp4'] = make_mp4(64 * 1024)
+    downloader.config.update(trace_downloads=True, trace_directory=str(tmp_path / "traces"))
+
+    assert traced_download(range_server, downloader, monkeypatch, 'a.mp4')
+    assert traced_download(range_server, downloader, monkeypatch, 'b.mp4')
+
+    assert len(os.listdir(tmp_path / "traces")) == 2
+
+
+def test_tracing_off_writes_nothing(range_server, downloader, monkeypatch, tmp_path):
+    range_server.files['/video.mp4'] = make_mp4(3 * 1024 * 1024)
+    downloader.config.update(trace_downloads=False, trace_directory=str(tmp_path / "traces"))
+
+    tracers = []
+    fetch_range = downloader.fetch_range
+
+    def recording_fetch_range(*args):
+        tracers.append(downloader.tracer)
+        return fetch_range(*args)
+    monkeypatch.setattr(downloader, 'fetch_range', recording_fetch_range)
+
+    assert traced_download(range_server, downloader, monkeypatch)
+
+    assert tracers == [None] * 3
+    assert downloader.tracer is None
+    assert not os.path.exists(tmp_path / "traces")
@@ -0,0 +1,43 @@
+"""Output verification and manifests"""
+
+from conftest import make_mp4
+
+
+def test_missing_checksum_fails_verification(tmp_path, downloader):
+    staged = tmp_path / "video.part.mp4"
+    staged.write_bytes(make_mp4(64 * 1024))
+
+    manifest = downloader.verify_output(str(staged), str(tmp_path / "video.mp4"), 'http://example.com/v.m3u8',
+                                        'ffmpeg', {"algorithm": "sha256-packets", "digest": None},
+                                        duration=40.0, expected_duration=40.0)
+
+    assert not manifest['verified']
+    assert "no checksum recorded" in manifest['problems']
+
+
+def test_complete_output_is_verified(tmp_path, downloader):
+    staged = tmp_path / "video.part.mp4"
+    staged.write_bytes(make_mp4(64 * 1024))
+
+    manifest = downloader.verify_output(str(staged), str(tmp_path / "video.mp4"), 'http://example.com/v.mp4',
+                                        'ranges', {"algorithm": "sha256-ranges", "digest": "ab" * 32},
+                                        expected_size=64 * 1024, expected_duration=40.0)
+
+    assert manifest['verified']
+    assert manifest['duration'] == 40.0
+
+
+def test_expected_duration_only_fetches_playlists(range_server, downloader):
+    range_server.files['/video.mp4'] = make_mp4(8 * 1024 * 1024)
+    range_server.files['/media.m3u8'] = b'#EXTM3U\n#EXTINF:25.0,\na.ts\n#EXTINF:15.0,\nb.ts\n#EXT-X-ENDLIST\n'
+
+    assert downloader.get_expected_duration(range_server.url('/video.mp4')) is None
+    assert range_server.requests == []
+    assert downloader.get_expected_duration(range_server.url('/media.m3u8')) == 40.0
+
+
+def test_non_playlist_content_is_not_cached(range_server, downloader):
+    range_server.files['/video.mp4'] = make_mp4(8 * 1024 * 1024)
+
+    assert downloader.fetch_media_playlist(range_server.url('/video.mp4')) is None
+    assert downloader.playlist_cache == {}